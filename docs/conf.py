@@ -212,6 +212,7 @@ intersphinx_mapping = {
     'bluepy': ('https://ianharvey.github.io/bluepy-doc/', None),
     'msl.network': ('https://msl-network.readthedocs.io/en/stable/', None),
     'msl.package_manage': ('https://msl-package-manager.readthedocs.io/en/stable/', None),
+    'numpy': ('https://numpy.org/doc/stable/', None),
     'paramiko': ('https://docs.paramiko.org/en/stable/', None),
 }
 
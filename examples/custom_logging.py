@@ -18,8 +18,9 @@ from smartgadget import connect, kill_manager
 # The IP address of the Raspberry Pi
 host = '192.168.1.100'
 
-# The password of the Raspberry Pi (this should be read from a file or from the terminal)
-rpi_password = '<PASSWORD>'
+# The password of the Raspberry Pi. It is read once (from an environment variable,
+# rather than being hard coded) and is reused if the connection needs to be re-established.
+rpi_password = os.environ.get('SMARTGADGET_RPI_PASSWORD')
 
 # The folder to save the data to (default value is the current working directory)
 save_dir = ''
@@ -30,38 +31,61 @@ mac_addresses = []
 # The number of seconds to wait after fetching the data from all Smart Gadgets
 sleep = 10
 
+# The number of seconds to wait before flushing the buffered data to the files.
+# The data is also synced to disk at this interval (rather than after every row)
+# so that, at most, this many seconds of data are lost if the script crashes.
+flush_interval = 60
+
 # Initialize these parameters (they don't need to be changed)
 files = {}
 rpi = None
+last_flush = time.monotonic()
 
 while True:
     try:
         if rpi is None:
-            # Connect to the Raspberry Pi and scan for Smart Gadgets
+            # Connect to the Raspberry Pi and scan for Smart Gadgets. The scan is only
+            # performed once, re-connecting (e.g., after a network error) uses the
+            # MAC addresses that were already found.
             print('Connecting to the Raspberry Pi...')
             rpi = connect(host=host, rpi_password=rpi_password, assert_hostname=False)
-            print('Scanning for Smart Gadgets...')
-            mac_addresses = rpi.scan()
-            print('Found {} Smart Gadgets'.format(len(mac_addresses)))
             if not mac_addresses:
-                break
+                print('Scanning for Smart Gadgets...')
+                mac_addresses = rpi.scan()
+                print('Found {} Smart Gadgets'.format(len(mac_addresses)))
+                if not mac_addresses:
+                    break
             print('Connecting to {} Smart Gadgets...'.format(len(mac_addresses)))
             rpi.connect_gadgets(mac_addresses)
+            # list the directory once rather than checking if each file exists
+            existing = set(os.listdir(save_dir or os.curdir))
             for address in mac_addresses:
-                files[address] = os.path.join(save_dir, address.replace(':', '-') + '.csv')
-                if not os.path.isfile(files[address]):
-                    print('Create logging file {!r}'.format(files[address]))
-                    with open(files[address], mode='wt') as f:
-                        f.write('Timestamp,Battery[%],Temperature[C],Humidity[%RH],Dewpoint[C]\n')
-
+                if address in files:
+                    continue
+                filename = address.replace(':', '-') + '.csv'
+                path = os.path.join(save_dir, filename)
+                # keep the file open, rather than re-opening it for every sample
+                files[address] = open(path, mode='at')
+                if filename not in existing:
+                    print('Create logging file {!r}'.format(path))
+                    files[address].write('Timestamp,Battery[%],Temperature[C],Humidity[%RH],Dewpoint[C]\n')
+
+        # Read the battery, temperature, humidity and dew point from all Smart Gadgets in one request
+        readings = rpi.read_all_current(mac_addresses)
+
+        # All Smart Gadgets were read at (effectively) the same time
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         for address in mac_addresses:
-            # Fetch the data and append to the appropriate file
-            battery = rpi.battery(address)
-            values = rpi.temperature_humidity_dewpoint(address)
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            # Append the data to the appropriate file
+            battery, *values = readings[address]
             print('{} [{}] {:3d} {:.3f} {:.3f} {:.3f}'.format(now, address, battery, *values))
-            with open(files[address], mode='at') as fp:
-                fp.write('{},{},{},{},{}\n'.format(now, battery, *values))
+            files[address].write('{},{},{},{},{}\n'.format(now, battery, *values))
+
+        if time.monotonic() - last_flush > flush_interval:
+            for fp in files.values():
+                fp.flush()
+                os.fsync(fp.fileno())
+            last_flush = time.monotonic()
 
         time.sleep(sleep)
 
@@ -90,3 +114,7 @@ except:
     pass
 
 print('Disconnected from the Raspberry Pi')
+
+# Close the logging files (this also writes any buffered data to the files)
+for fp in files.values():
+    fp.close()
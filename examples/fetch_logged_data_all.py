@@ -0,0 +1,63 @@
+"""
+This example assumes that you are connecting to a Raspberry Pi from
+another computer on the network to fetch the logged data from all
+available Smart Gadgets.
+
+The data from one Smart Gadget is saved to a file (in a background
+thread) while the data from the next Smart Gadget is being fetched.
+"""
+import queue
+import threading
+
+from smartgadget import connect, milliseconds_to_datetime, save_logged_data
+
+
+def writer(q):
+    # Save the data from the queue until the sentinel value, None, is received
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        address, temperatures, humidities = item
+        # the returned timestamps are in milliseconds
+        temperatures = [[milliseconds_to_datetime(ms), v] for ms, v in temperatures]
+        humidities = [[milliseconds_to_datetime(ms), v] for ms, v in humidities]
+        filename = address.replace(':', '-') + '_logged.csv'
+        save_logged_data(filename, temperatures, humidities)
+        print('Saved {!r}'.format(filename))
+
+
+# Connect to the Raspberry Pi (update the IP address of the Raspberry Pi)
+rpi = connect(host='192.168.1.100', assert_hostname=False)
+
+# Get all available Smart Gadgets
+mac_addresses = rpi.scan()
+print('Found {} Smart Gadgets'.format(len(mac_addresses)))
+
+# Start the thread that saves the data
+data_queue = queue.Queue()
+thread = threading.Thread(target=writer, args=(data_queue,), daemon=True)
+thread.start()
+
+# Connect to the Smart Gadgets so that each Bluetooth connection is
+# reused while the missing data is re-downloaded
+connected, failed = rpi.connect_gadgets(mac_addresses, strict=False)
+for address in failed:
+    print('Could not connect to {!r}'.format(address))
+
+# Fetch all temperature and humidity logger data from each Smart Gadget.
+# This step can take a very long time (minutes) for each Smart Gadget.
+for address in mac_addresses:
+    if address in failed:
+        continue
+    print('Fetching data from {!r}...'.format(address))
+    temperatures, humidities = rpi.fetch_logged_data(address, num_iterations=2)
+    data_queue.put((address, temperatures, humidities))
+
+# Disconnect from the Smart Gadgets and from the Raspberry Pi when finished communicating with them
+rpi.disconnect_gadgets()
+rpi.disconnect()
+
+# Wait for all data to be saved
+data_queue.put(None)
+thread.join()
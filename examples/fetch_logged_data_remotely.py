@@ -36,5 +36,5 @@ rpi.disconnect()
 # Save the temperature results (the returned timestamps are in milliseconds)
 with open('temperature.csv', mode='wt') as fp:
     fp.write('timestamp,temperature[C]\n')
-    for timestamp, value in temperatures:
-        fp.write('{},{}\n'.format(milliseconds_to_datetime(timestamp), value))
+    fp.write(''.join('{},{}\n'.format(milliseconds_to_datetime(timestamp), value)
+                     for timestamp, value in temperatures))
@@ -15,7 +15,7 @@ Next, execute the script
 
 """
 import logging
-from smartgadget import SHT3XService
+from smartgadget import SHT3XService, save_logged_data
 
 # This allows you to see some status messages displayed to the terminal
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s [%(levelname)-7s] %(message)s')
@@ -35,13 +35,7 @@ temperatures, humidities = s.fetch_logged_data(mac_address, num_iterations=2, as
 # Disconnect from the Smart Gadget when finished communicating with it
 s.disconnect_gadgets()
 
-# Save the results
-with open('temperature.csv', mode='wt') as fp:
-    fp.write('timestamp,temperature[C]\n')
-    for row in temperatures:
-        fp.write('{},{}\n'.format(*row))
-
-with open('humidity.csv', mode='wt') as fp:
-    fp.write('timestamp,humidity[%RH]\n')
-    for row in humidities:
-        fp.write('{},{}\n'.format(*row))
+# Save the results to a CSV file. If numpy is installed then the
+# results could be saved to a (smaller) compressed binary file instead
+#   save_logged_data('logged_data.npz', temperatures, humidities, fmt='npz')
+save_logged_data('logged_data.csv', temperatures, humidities)
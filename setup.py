@@ -83,8 +83,8 @@ def read(filename):
 
 
 def fetch_init(key):
-    # open the __init__.py file to determine a value instead of importing the package
-    return re.search(r'{}\s*=\s*(.+)'.format(key), read(init_original)).group(1).strip('\'\"')
+    # parse the __init__.py file to determine a value instead of importing the package
+    return re.search(r'{}\s*=\s*(.+)'.format(key), init_source).group(1).strip('\'\"')
 
 
 def get_version():
@@ -128,9 +128,6 @@ def get_version():
     # following PEP-440, the local version identifier starts with '+'
     dev_version = init_version + '+' + suffix
 
-    with open(init_original) as fp:
-        init_source = fp.read()
-
     if os.path.isfile(init_backup):
         os.remove(init_backup)
     os.rename(init_original, init_backup)
@@ -165,6 +162,7 @@ sphinx = docs_require + install_requires if needs_sphinx else []
 
 init_original = 'smartgadget/__init__.py'
 init_backup = init_original + '.backup'
+init_source = read(init_original)
 version = get_version()
 
 setup(
@@ -199,6 +197,7 @@ setup(
     extras_require={
         'tests': tests_require,
         'docs': docs_require,
+        'numpy': ['numpy'],
     },
     packages=find_packages(include=('smartgadget*',)),
     cmdclass={'docs': BuildDocs, 'apidocs': ApiDocs},
@@ -2,7 +2,9 @@
 Communicate with a Sensirion SHTxx Smart Gadget.
 """
 import logging
-from math import exp, log10
+from bisect import bisect_left
+from functools import lru_cache
+from math import e, log10, sqrt
 from datetime import datetime
 
 from msl.network import manager, ssh
@@ -79,19 +81,54 @@ def kill_manager(*, host='raspberrypi', rpi_username='pi', rpi_password=None, ti
         Keyword arguments that are passed to :meth:`~paramiko.client.SSHClient.connect`.
     """
     ssh_client = ssh.connect(host, username=rpi_username, password=rpi_password, timeout=timeout, **kwargs)
-    lines = ssh.exec_command(ssh_client, 'ps aux | grep smartgadget')
-    pids = [line.split()[1] for line in lines if RPI_EXE_PATH in line]
-    for pid in pids:
-        try:
-            ssh.exec_command(ssh_client, 'sudo kill -9 ' + pid)
-        except:
-            pass
+    # kill all matching processes in a single round trip, the first character of the
+    # pattern is wrapped in [] so that the shell that runs pkill does not match itself
+    try:
+        ssh.exec_command(ssh_client, "sudo pkill -9 -f '[{}]{}'".format(RPI_EXE_PATH[0], RPI_EXE_PATH[1:]))
+    except:
+        pass
     ssh_client.close()
 
 
+# The coefficients for Equation 3 and Equation 7 from
+# https://www.vaisala.com/sites/default/files/documents/Humidity_Conversion_Formulas_B210973EN.pdf
+_PWS_C1 = -7.85951783
+_PWS_C2 = 1.84408259
+_PWS_C3 = -11.7866497
+_PWS_C4 = 22.6807411
+_PWS_C5 = -15.9618719
+_PWS_C6 = 1.80122502
+_PWS_PC = 220640.
+_PWS_TC = 647.096
+_PWS_INV_TC = 1. / _PWS_TC
+
+_LOG10_E = log10(e)
+
+# The upper limit of each temperature range of Equation 7 (the limit is included in the
+# range, except for 100 degree C which belongs to the 100 <= t <= 150 range)
+_DEWPOINT_EDGES = (50, 100, 150, 200, 350)
+
+# (A, m, Tn) for each temperature range of Equation 7
+_DEWPOINT_COEFFICIENTS = (
+    (6.116441, 7.591386, 240.7263),  # -20 <= t <= 50
+    (6.004918, 7.337936, 229.3975),  #  50 < t < 100
+    (5.856548, 7.277310, 225.1033),  # 100 <= t <= 150
+    (6.002859, 7.290361, 227.1704),  # 150 < t <= 200
+    (9.980622, 7.388931, 263.1239),  # 200 < t <= 350
+)
+
+# log10(Pc / (100 * A)) for each temperature range of Equation 7
+_DEWPOINT_LOG10_PC_A = tuple(log10(_PWS_PC / (100. * A)) for A, _, _ in _DEWPOINT_COEFFICIENTS)
+
+
+@lru_cache(maxsize=4096)
 def dewpoint(temperature, humidity):
     """Calculate the dew point.
 
+    The Smart Gadgets report values with a limited resolution, so the same
+    temperature and humidity pair is often requested many times. The most
+    recent results are cached.
+
     Parameters
     ----------
     temperature : :class:`float`
@@ -108,42 +145,72 @@ def dewpoint(temperature, humidity):
     #  For now use Equation 7 from
     #  https://www.vaisala.com/sites/default/files/documents/Humidity_Conversion_Formulas_B210973EN.pdf
 
-    if temperature < -20 or temperature > 350:
+    if not -20 <= temperature <= 350:
         # the Equation 7 is only valid between -20 and +350 degree C
         raise ValueError('temperature={} is not between -20 and +350 degree C'.format(temperature))
 
-    # calculate Pws using Equation 3
-    C1 = -7.85951783
-    C2 = 1.84408259
-    C3 = -11.7866497
-    C4 = 22.6807411
-    C5 = -15.9618719
-    C6 = 1.80122502
-    Pc = 220640.
-    Tc = 647.096
-    kelvin = temperature + 273.15
-    x = 1.0 - kelvin / Tc
-    y = (Tc / kelvin) * (C1 * x + C2 * x**1.5 + C3 * x**3 + C4 * x**3.5 + C5 * x**4 + C6 * x**7.5)
-    Pws = Pc * exp(y)
-
-    # calculate Pw using Equation 1
-    Pw = Pws * humidity / 100.
-
-    # calculate the dew point using Equation 7
-    if -20 <= temperature <= 50:
-        A, m, Tn = 6.116441, 7.591386, 240.7263
-    elif 50 < temperature < 100:
-        A, m, Tn = 6.004918, 7.337936, 229.3975
-    elif 100 <= temperature <= 150:
-        A, m, Tn = 5.856548, 7.277310, 225.1033
-    elif 150 < temperature <= 200:
-        A, m, Tn = 6.002859, 7.290361, 227.1704
-    elif 200 < temperature <= 350:
-        A, m, Tn = 9.980622, 7.388931, 263.1239
-    else:
-        assert False, 'should never get here'
+    # calculate ln(Pws / Pc) using Equation 3
+    # (x is always positive, so the fractional powers are calculated using sqrt
+    # and the polynomial is factored to share the powers of x between the terms)
+    tr = (temperature + 273.15) * _PWS_INV_TC  # T / Tc
+    x = 1.0 - tr
+    sx = sqrt(x)
+    x2 = x * x
+    y = x * (_PWS_C1 + _PWS_C2 * sx +
+             x2 * (_PWS_C3 + _PWS_C4 * sx + x * (_PWS_C5 + _PWS_C6 * x2 * x * sx))) / tr
+
+    # calculate the dew point using Equation 7, where Pws = Pc * exp(y) and Pw = Pws * humidity / 100
+    # (Equation 1), therefore log10(Pw / A) = y * log10(e) + log10(humidity) + log10(Pc / (100 * A))
+    index = 2 if temperature == 100 else bisect_left(_DEWPOINT_EDGES, temperature)
+    _, m, Tn = _DEWPOINT_COEFFICIENTS[index]
+    log10_pw_a = y * _LOG10_E + log10(humidity) + _DEWPOINT_LOG10_PC_A[index]
+    return Tn / (m / log10_pw_a - 1.0)
+
+
+def dewpoint_batch(temperatures, humidities):
+    """Calculate the dew point for many temperature and humidity values.
+
+    This function can only be called if the `numpy` package is installed.
+
+    A value that is :data:`None` or NaN (e.g., a value that could not be downloaded
+    from the data logger, see :meth:`~smartgadget.sht3x.SHT3XService.fetch_logged_data`)
+    results in a dew point of NaN.
+
+    Parameters
+    ----------
+    temperatures : :class:`list` of :class:`float`
+        The temperature values [degree C].
+    humidities : :class:`list` of :class:`float`
+        The humidity values [%RH].
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The dew point values [degree C].
+    """
+    import numpy as np
+    t = np.asarray(temperatures, dtype=float)
+    h = np.asarray(humidities, dtype=float)
+
+    if np.any((t < -20) | (t > 350)):
+        # the Equation 7 is only valid between -20 and +350 degree C
+        raise ValueError('the temperature values are not all between -20 and +350 degree C')
+
+    # calculate ln(Pws / Pc) using Equation 3
+    tr = (t + 273.15) * _PWS_INV_TC  # T / Tc
+    x = 1.0 - tr
+    sx = np.sqrt(x)
+    x2 = x * x
+    y = x * (_PWS_C1 + _PWS_C2 * sx +
+             x2 * (_PWS_C3 + _PWS_C4 * sx + x * (_PWS_C5 + _PWS_C6 * x2 * x * sx))) / tr
 
-    return Tn / (m / log10(Pw / A) - 1.0)
+    # calculate the dew point using Equation 7 (see dewpoint() for why exp(y) is not evaluated)
+    # (NaN is sorted after the last edge, use the last range so that NaN propagates)
+    index = np.searchsorted(_DEWPOINT_EDGES, t, side='left')
+    index = np.where(t == 100, 2, np.minimum(index, len(_DEWPOINT_EDGES) - 1))
+    _, m, Tn = np.array(_DEWPOINT_COEFFICIENTS)[index].T
+    log10_pw_a = y * _LOG10_E + np.log10(h) + np.array(_DEWPOINT_LOG10_PC_A)[index]
+    return Tn / (m / log10_pw_a - 1.0)
 
 
 def timestamp_to_milliseconds(obj):
@@ -167,13 +234,23 @@ def timestamp_to_milliseconds(obj):
         return round(obj * 1e3)
 
     if isinstance(obj, str):  # an ISO-8601 string
-        string = obj.replace('T', ' ')
+        obj = _parse_iso(obj)
+
+    return round(obj.timestamp() * 1e3)
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso(string):
+    """Convert an ISO-8601 string to a :class:`~datetime.datetime` object."""
+    try:
+        # fromisoformat is much faster than strptime but it requires Python 3.7+
+        return datetime.fromisoformat(string)
+    except (AttributeError, ValueError):
+        string = string.replace('T', ' ')
         fmt = '%Y-%m-%d %H:%M:%S'
         if '.' in string:
             fmt += '.%f'
-        obj = datetime.strptime(string, fmt)
-
-    return round(obj.timestamp() * 1e3)
+        return datetime.strptime(string, fmt)
 
 
 def milliseconds_to_datetime(milliseconds):
@@ -192,6 +269,51 @@ def milliseconds_to_datetime(milliseconds):
     return datetime.fromtimestamp(milliseconds * 1e-3)
 
 
+def save_logged_data(path, temperatures, humidities, *, fmt='csv'):
+    """Save the logged data that was returned by :meth:`~smartgadget.sht3x.SHT3XService.fetch_logged_data`.
+
+    Parameters
+    ----------
+    path : :class:`str`
+        The path of the file to save the data to.
+    temperatures : :class:`list`
+        The logged temperature values [degree C].
+    humidities : :class:`list`
+        The logged humidity values [%RH].
+    fmt : :class:`str`, optional
+        The file format. Either ``'csv'`` or ``'npz'``. The ``'npz'`` format
+        can only be used if the `numpy` package is installed. The data is
+        saved using :func:`numpy.savez_compressed`, the timestamps are in
+        milliseconds and a value that is :data:`None` is saved as ``NaN``.
+    """
+    if temperatures and humidities and len(temperatures) != len(humidities):
+        raise ValueError('The number of temperature and humidity values are not the same')
+
+    timestamps = [row[0] for row in temperatures or humidities]
+    columns = []
+    if temperatures:
+        columns.append(('temperature[C]', 'temperatures', [row[1] for row in temperatures]))
+    if humidities:
+        columns.append(('humidity[%RH]', 'humidities', [row[1] for row in humidities]))
+
+    if fmt == 'csv':
+        header = ','.join(['timestamp'] + [name for name, _, _ in columns])
+        rows = zip(timestamps, *(values for _, _, values in columns))
+        lines = [header]
+        lines.extend(','.join(map(str, row)) for row in rows)
+        lines.append('')
+        with open(path, mode='wt') as fp:
+            fp.write('\n'.join(lines))
+    elif fmt == 'npz':
+        import numpy as np
+        arrays = {'timestamps': np.array([timestamp_to_milliseconds(t) for t in timestamps], dtype=np.int64)}
+        for _, key, values in columns:
+            arrays[key] = np.array(values, dtype=float)  # None becomes NaN
+        np.savez_compressed(path, **arrays)
+    else:
+        raise ValueError('Invalid file format {!r}, must be either csv or npz'.format(fmt))
+
+
 def scan(*, interface=0, delegate=None, timeout=10, passive=False):
     """Scan for Bluetooth devices.
 
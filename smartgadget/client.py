@@ -18,13 +18,24 @@ class SmartGadgetClient(LinkedClient):
         """
         super(SmartGadgetClient, self).__init__(service_name, **kwargs)
 
+    def __del__(self):
+        # shutdown_service() can still raise an exception during interpreter teardown
+        try:
+            self.disconnect()
+        except Exception:
+            pass
+
     def disconnect(self):
         """
         Shut down the Smart Gadget :class:`~msl.network.service.Service`
         and the Network :class:`~msl.network.manager.Manager`.
         """
-        self.shutdown_service()
-        super(SmartGadgetClient, self).disconnect()
+        # disconnect() is also called by __del__, after the link may already be broken
+        try:
+            if self.link is not None:
+                self.shutdown_service()
+        finally:
+            super(SmartGadgetClient, self).disconnect()
 
     def service_error_handler(self):
         """
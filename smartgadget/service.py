@@ -1,26 +1,107 @@
 """
 Base class for a Smart Gadget :class:`~msl.network.service.Service`.
 """
+import random
 import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Tuple
+from typing import List, Tuple, Dict
 
 from msl.network import Service
 try:
-    from bluepy.btle import Scanner, BTLEDisconnectError
+    from bluepy.btle import Scanner, BTLEException, BTLEDisconnectError
 except ImportError:  # then not on the Raspberry Pi
-    Scanner, BTLEDisconnectError = object, object
+    Scanner, BTLEException, BTLEDisconnectError = object, object, object
 
 from . import (
     logger,
+    dewpoint,
     timestamp_to_milliseconds,
     milliseconds_to_datetime,
+    _parse_iso,
 )
 
 
+class _SharedScanner(object):
+
+    def __init__(self):
+        """Performs the Bluetooth scans for all Smart Gadget services in this process.
+
+        Only one scan is performed at a time (BlueZ responds with an ``InProgress`` error
+        to overlapping scans). A service that requests a scan while another scan is in
+        progress waits for that scan to finish and reuses the devices that it found.
+        """
+        self._lock = threading.Lock()
+        self._scanners = {}
+        self._results = {}
+
+    def scan(self, interface, timeout, passive, done=None):
+        """Returns a list of :ref:`ScanEntry <scanentry>` objects.
+
+        If `done` is not :data:`None` then it is called with the list of devices
+        that have been found so far and the scan stops when it returns :data:`True`.
+        """
+        requested = time.monotonic()
+        with self._lock:
+            result = self._results.get(interface)
+            if result is not None:
+                finished, duration, was_passive, devices = result
+                # only reuse a scan that finished while this request was waiting for the
+                # lock, the scan must have lasted at least as long (or found what is
+                # being looked for) and an active scan also receives the scan response
+                # data (which a passive scan does not)
+                if finished > requested and (passive or not was_passive) and \
+                        (duration >= timeout or (done is not None and done(devices))):
+                    logger.debug('Using the devices from the scan that finished while waiting')
+                    return devices
+
+            scanner = self._scanners.get(interface)
+            if scanner is None:
+                scanner = self._scanners[interface] = Scanner(interface)
+
+            if done is None:
+                devices = list(scanner.scan(timeout=timeout, passive=passive))
+                duration = timeout
+            else:
+                t0 = time.monotonic()
+                scanner.clear()
+                scanner.start(passive=passive)
+                try:
+                    while True:
+                        remaining = timeout - (time.monotonic() - t0)
+                        if remaining <= 0:
+                            break
+                        scanner.process(timeout=min(0.25, remaining))
+                        if done(list(scanner.getDevices())):
+                            break
+                finally:
+                    scanner.stop()
+                devices = list(scanner.getDevices())
+                duration = time.monotonic() - t0
+
+            self._results[interface] = (time.monotonic(), duration, passive, devices)
+            return devices
+
+
+_shared_scanner = _SharedScanner()
+
+
 class SmartGadgetService(Service):
 
-    def __init__(self, cls, interface=None):
+    # the requests that only read from a Smart Gadget, identical requests for
+    # the same Smart Gadget that are processed concurrently share the result
+    _SHARED_REQUESTS = (
+        'temperature', 'humidity', 'temperature_humidity', 'battery_temperature_humidity_dewpoint',
+        'battery', 'rssi', 'info',
+    )
+
+    # the number of seconds that a temperature and humidity reading is reused for
+    _RECENT_MAX_AGE = 0.2
+
+    def __init__(self, cls, interface=None, **kwargs):
         """Base class for a Smart Gadget :class:`~msl.network.service.Service`.
 
         Parameters
@@ -31,18 +112,34 @@ class SmartGadgetService(Service):
         interface : :class:`int`, optional
             The Bluetooth interface to use for the connection. For example, 0 or :data:`None`
             means ``/dev/hci0``, 1 means ``/dev/hci1``.
+        **kwargs
+            Keyword arguments that are passed to `cls` when connecting to a Smart Gadget.
         """
         super(SmartGadgetService, self).__init__(name=cls.DEVICE_NAME)
         self._device_name = cls.DEVICE_NAME
+        self._device_name_bytes = cls.DEVICE_NAME.encode()
         self._cls = cls
         self._interface = interface
+        self._kwargs = kwargs
         self._max_attempts = 5
-        self._retries_remaining = 0
-        self._scanner = Scanner(interface)
+        self._backoff_base = 1.0
+        self._backoff_maximum = 64.0
+        self._backoff_jitter = 0.5
         self._gadgets_available = {}
+        self._last_scan = None  # the time.monotonic() value when scan() last finished
         self._gadgets_connected = {}
         # only add a MAC address in here if the connection request was made explicitly
         self._requested_connections = set()
+        # the Smart Gadgets that were not explicitly connected to but are kept connected
+        # after a request, ordered from the least to the most recently used
+        self._pool = OrderedDict()
+        self._pool_size = 0
+        self._pool_lock = threading.Lock()
+        # the requests that are currently being processed, see _SHARED_REQUESTS
+        self._in_progress = {}
+        self._in_progress_lock = threading.Lock()
+        # the most recent (time.monotonic(), temperature, humidity) reading of each Smart Gadget
+        self._recent = {}
 
     def max_attempts(self) -> int:
         """Returns the maximum number of times to try to connect or read/write data from/to a Smart Gadget.
@@ -72,7 +169,75 @@ class SmartGadgetService(Service):
         self._max_attempts = max(1, int(max_attempts))
         logger.debug('The maximum number attempts has been set to %d', self._max_attempts)
 
-    def scan(self, timeout=10, passive=False) -> List[str]:
+    def backoff(self) -> Tuple[float, float, float]:
+        """Returns the parameters that determine how long to wait before retrying a request.
+
+        Returns
+        -------
+        :class:`float`
+            The number of seconds to wait after the first failed attempt.
+        :class:`float`
+            The maximum number of seconds to wait (excluding the jitter).
+        :class:`float`
+            The maximum number of random seconds that are added to the wait time.
+        """
+        return self._backoff_base, self._backoff_maximum, self._backoff_jitter
+
+    def set_backoff(self, base=1.0, maximum=64.0, jitter=0.5):
+        """Set the parameters that determine how long to wait before retrying a request.
+
+        After a failed attempt to connect or read/write data from/to a Smart Gadget, the
+        Bluetooth stack on the Raspberry Pi may still be releasing the previous connection.
+        Retrying immediately often fails again, so the wait time is doubled after each
+        failed attempt, ``min(maximum, base * 2 ** n) + uniform(0, jitter)``.
+
+        Parameters
+        ----------
+        base : :class:`float`, optional
+            The number of seconds to wait after the first failed attempt. A value of 0
+            (and a `jitter` of 0) means to retry immediately.
+        maximum : :class:`float`, optional
+            The maximum number of seconds to wait (excluding the jitter).
+        jitter : :class:`float`, optional
+            The maximum number of random seconds that are added to the wait time.
+        """
+        self._backoff_base = max(0., float(base))
+        self._backoff_maximum = max(0., float(maximum))
+        self._backoff_jitter = max(0., float(jitter))
+        logger.debug('The backoff has been set to base=%s, maximum=%s, jitter=%s',
+                     self._backoff_base, self._backoff_maximum, self._backoff_jitter)
+
+    def pool_size(self) -> int:
+        """Returns the maximum number of Smart Gadgets that are kept connected after a request.
+
+        Returns
+        -------
+        :class:`int`
+            The maximum number of Smart Gadgets that are kept connected.
+        """
+        return self._pool_size
+
+    def set_pool_size(self, size):
+        """Set the maximum number of Smart Gadgets that are kept connected after a request.
+
+        A Smart Gadget that was not connected to by calling :meth:`.connect_gadget` (or
+        :meth:`.connect_gadgets`) is disconnected after each request, by default. Keeping
+        the Bluetooth connection avoids the approximately 7 seconds it takes to re-connect
+        the next time that data is requested from the same Smart Gadget. When the number
+        of these Smart Gadgets exceeds `size`, the least-recently used Smart Gadget is
+        disconnected.
+
+        Parameters
+        ----------
+        size : :class:`int`
+            The maximum number of Smart Gadgets to keep connected. A value of 0 means that
+            a Smart Gadget is disconnected after each request.
+        """
+        self._pool_size = max(0, int(size))
+        logger.debug('The pool size has been set to %d', self._pool_size)
+        self._release(None)
+
+    def scan(self, timeout=10, passive=False, expected=None, max_age=0) -> List[str]:
         """Scan for Smart Gadgets that are within Bluetooth range.
 
         Parameters
@@ -81,6 +246,13 @@ class SmartGadgetService(Service):
             The number of seconds to scan for Smart Gadgets.
         passive : :class:`bool`, optional
             Use active (to obtain more information when connecting) or passive scanning.
+        expected : :class:`int` or :class:`list` of :class:`str`, optional
+            Stop scanning before `timeout` seconds have elapsed once this number of Smart
+            Gadgets, or all of these MAC addresses, have been found. If :data:`None`
+            then scan for `timeout` seconds.
+        max_age : :class:`float`, optional
+            If the previous scan finished less than `max_age` seconds ago then return the
+            Smart Gadgets that it found, without scanning again.
 
         Returns
         -------
@@ -88,21 +260,75 @@ class SmartGadgetService(Service):
             A list of MAC addresses of the Smart Gadgets that are available for this
             particular SHTxx class.
         """
+        if max_age > 0 and self._last_scan is not None and time.monotonic() - self._last_scan < max_age:
+            logger.debug('Using the Smart Gadgets from the previous scan')
+            return list(self._gadgets_available)
+
+        if expected is None:
+            done = None
+        elif isinstance(expected, int):
+            def done(devices):
+                return sum(1 for d in devices if self._is_gadget(d)) >= expected
+        else:
+            if isinstance(expected, str):
+                expected = [expected]
+            addresses = set(address.lower() for address in expected)
+
+            def done(devices):
+                return addresses.issubset(d.addr for d in devices if self._is_gadget(d))
+
         self._gadgets_available.clear()
         logger.info('Scanning for %r...', self._device_name)
-        for d in self._scanner.scan(timeout=timeout, passive=passive):
-            if d.getValueText(d.COMPLETE_LOCAL_NAME) == self._device_name:
+        for d in _shared_scanner.scan(self._interface, timeout, passive, done=done):
+            if self._is_gadget(d):
                 self._gadgets_available[d.addr] = d
+        self._last_scan = time.monotonic()
         logger.info('Found %d Smart Gadgets', len(self._gadgets_available))
         return list(self._gadgets_available)
 
+    def find_gadget(self, mac_address, timeout=10, passive=False) -> bool:
+        """Scan for a particular Smart Gadget.
+
+        Unlike :meth:`.scan`, which always scans for `timeout` seconds, the scan
+        stops as soon as the Smart Gadget is found.
+
+        Parameters
+        ----------
+        mac_address : :class:`str`
+            The MAC address of the Smart Gadget to find.
+        timeout : :class:`float`, optional
+            The maximum number of seconds to scan for the Smart Gadget.
+        passive : :class:`bool`, optional
+            Use active (to obtain more information when connecting) or passive scanning.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the Smart Gadget is within Bluetooth range.
+        """
+        mac_address = mac_address.lower()
+
+        def is_gadget(d):
+            return d.addr == mac_address and self._is_gadget(d)
+
+        def done(devices):
+            return any(is_gadget(d) for d in devices)
+
+        logger.info('Scanning for %r...', mac_address)
+        for d in _shared_scanner.scan(self._interface, timeout, passive, done=done):
+            if is_gadget(d):
+                self._gadgets_available[d.addr] = d
+                return True
+        return False
+
     def connect_gadget(self, mac_address, strict=True) -> bool:
         """Connect to the specified Smart Gadget.
 
         It is not necessary to call this method to connect to a Smart Gadget via Bluetooth
         before fetching data from it. The Bluetooth connection will automatically be
         created and destroyed when requesting information from the Smart Gadget if the
-        Bluetooth connection does not already exist.
+        Bluetooth connection does not already exist. It is also not necessary to call
+        :meth:`.scan` first if the MAC address of the Smart Gadget is already known.
 
         Establishing a Bluetooth connection to a Smart Gadget takes approximately 7 seconds.
         If you are only requesting data from a couple of Smart Gadgets then connecting to each
@@ -132,12 +358,17 @@ class SmartGadgetService(Service):
 
         See :meth:`.connect_gadget` for more details.
 
+        The Bluetooth connections are established in parallel, with at most 4 Smart Gadgets
+        being connected to at the same time.
+
         Parameters
         ----------
         mac_addresses : :class:`list` of :class:`str`
             A list of MAC addresses of the Smart Gadgets to connect to.
         strict : :class:`bool`, optional
             Whether to raise an error if a Smart Gadget could not be connected to.
+            If an error is raised then the Smart Gadgets that this call connected to
+            are disconnected.
 
         Returns
         -------
@@ -145,19 +376,42 @@ class SmartGadgetService(Service):
             A list of MAC addresses of the Smart Gadgets that were successfully connected to
             and the MAC addresses of the Smart Gadgets that could not be connected to.
         """
+        def connect(address):
+            # each connection has its own number of retries
+            self._connect(address, self._max_attempts)
+            self._requested_connections.add(address)
+
         failed_connections = []
-        for mac_address in mac_addresses:
-            self._retries_remaining = self._max_attempts
-            try:
-                self._connect(mac_address)
-                self._requested_connections.add(mac_address)
-            except BTLEDisconnectError as e:
-                if strict:
-                    logger.error(e)
-                    raise
-                else:
-                    logger.warning('Could not connect to %r', mac_address)
-                    failed_connections.append(mac_address)
+        mac_addresses = list(dict.fromkeys(mac_addresses))  # remove duplicates
+        if not mac_addresses:
+            return list(self._gadgets_connected), failed_connections
+
+        # the Smart Gadgets that must remain connected if a connection fails in strict mode
+        keep = set(self._gadgets_connected) | self._requested_connections
+        error = None
+        with ThreadPoolExecutor(max_workers=min(len(mac_addresses), 4)) as executor:
+            futures = [executor.submit(connect, mac_address) for mac_address in mac_addresses]
+            for mac_address, future in zip(mac_addresses, futures):
+                try:
+                    future.result()
+                except BTLEDisconnectError as e:
+                    if strict:
+                        logger.error(e)
+                        error = e
+                        for f in futures:
+                            f.cancel()
+                        break
+                    else:
+                        logger.warning('Could not connect to %r', mac_address)
+                        failed_connections.append(mac_address)
+
+        if error is not None:
+            # the caller does not know about the connections that this call made
+            for mac_address in mac_addresses:
+                if mac_address not in keep:
+                    self.disconnect_gadget(mac_address)
+            raise error
+
         return list(self._gadgets_connected), failed_connections
 
     def connected_gadgets(self) -> List[str]:
@@ -178,35 +432,38 @@ class SmartGadgetService(Service):
         mac_address : :class:`str`
             The MAC address of the Smart Gadget to disconnect from.
         """
+        with self._pool_lock:
+            self._pool.pop(mac_address, None)
         gadget = self._gadgets_connected.pop(mac_address, None)
         if gadget:
-            try:
-                logger.info('Disconnecting from %r...', mac_address)
-                gadget.disconnect()
-            except:
-                pass
-        try:
-            self._requested_connections.remove(mac_address)
-        except:
-            pass
+            logger.info('Disconnecting from %r...', mac_address)
+            self._disconnect(gadget)
+        self._requested_connections.discard(mac_address)
 
     def disconnect_gadgets(self):
         """Disconnect from all Smart Gadgets."""
-        for mac_address, gadget in self._gadgets_connected.items():
-            try:
-                gadget.disconnect()
-            except:
-                pass
-            try:
-                self._requested_connections.remove(mac_address)
-            except:
-                pass
+        # take a snapshot so that the dict is not modified while it is iterated over
+        gadgets = list(self._gadgets_connected.items())
         self._gadgets_connected.clear()
+        self._requested_connections.difference_update(mac_address for mac_address, _ in gadgets)
+        if len(gadgets) > 1:
+            # each Smart Gadget has its own bluepy-helper process, so disconnect in parallel
+            with ThreadPoolExecutor(max_workers=len(gadgets)) as executor:
+                list(executor.map(self._disconnect, (gadget for _, gadget in gadgets)))
+        elif gadgets:
+            self._disconnect(gadgets[0][1])
+        with self._pool_lock:
+            self._pool.clear()
         logger.info('Disconnected from all Smart Gadgets')
 
     def temperature(self, mac_address) -> float:
         """Returns the current temperature for the specified MAC address.
 
+        A reading that was taken less than 0.2 seconds ago, or that is received by
+        a concurrent request for the same Smart Gadget, is returned instead of reading
+        the Smart Gadget again. Polling faster than 5 Hz can therefore return the
+        same value more than once.
+
         Parameters
         ----------
         mac_address : :class:`str`
@@ -217,11 +474,19 @@ class SmartGadgetService(Service):
         :class:`float`
             The temperature [degree C].
         """
+        recent = self._recent_reading(mac_address)
+        if recent is not None:
+            return recent[0]
         return self._process('temperature', mac_address)
 
     def humidity(self, mac_address) -> float:
         """Returns the current humidity for the specified MAC address.
 
+        A reading that was taken less than 0.2 seconds ago, or that is received by
+        a concurrent request for the same Smart Gadget, is returned instead of reading
+        the Smart Gadget again. Polling faster than 5 Hz can therefore return the
+        same value more than once.
+
         Parameters
         ----------
         mac_address : :class:`str`
@@ -232,11 +497,18 @@ class SmartGadgetService(Service):
         :class:`float`
             The humidity [%RH].
         """
+        recent = self._recent_reading(mac_address)
+        if recent is not None:
+            return recent[1]
         return self._process('humidity', mac_address)
 
     def dewpoint(self, mac_address, temperature=None, humidity=None) -> float:
         """Returns the dew point for the specified MAC address.
 
+        If `temperature` or `humidity` is :data:`None` then a reading that was taken
+        less than 0.2 seconds ago, or that is received by a concurrent request for the
+        same Smart Gadget, is used instead of reading the Smart Gadget again.
+
         Parameters
         ----------
         mac_address : :class:`str`
@@ -253,11 +525,22 @@ class SmartGadgetService(Service):
         :class:`float`
             The dew point [degree C].
         """
-        return self._process('dewpoint', mac_address, temperature=temperature, humidity=humidity)
+        if temperature is None or humidity is None:
+            t, h = self._temperature_humidity(mac_address)
+            if temperature is None:
+                temperature = t
+            if humidity is None:
+                humidity = h
+        return dewpoint(temperature, humidity)
 
     def temperature_humidity(self, mac_address) -> Tuple[float, float]:
         """Returns the current temperature and humidity for the specified MAC address.
 
+        A reading that was taken less than 0.2 seconds ago, or that is received by
+        a concurrent request for the same Smart Gadget, is returned instead of reading
+        the Smart Gadget again. Polling faster than 5 Hz can therefore return the
+        same value more than once.
+
         Parameters
         ----------
         mac_address : :class:`str`
@@ -270,11 +553,16 @@ class SmartGadgetService(Service):
         :class:`float`
             The humidity [%RH].
         """
-        return self._process('temperature_humidity', mac_address)
+        return self._temperature_humidity(mac_address)
 
     def temperature_humidity_dewpoint(self, mac_address) -> Tuple[float, float, float]:
         """Returns the current temperature, humidity and dew point for the specified MAC address.
 
+        A reading that was taken less than 0.2 seconds ago, or that is received by
+        a concurrent request for the same Smart Gadget, is returned instead of reading
+        the Smart Gadget again. Polling faster than 5 Hz can therefore return the
+        same value more than once.
+
         Parameters
         ----------
         mac_address : :class:`str`
@@ -289,7 +577,37 @@ class SmartGadgetService(Service):
         :class:`float`
             The dew point [degree C].
         """
-        return self._process('temperature_humidity_dewpoint', mac_address)
+        t, h = self._temperature_humidity(mac_address)
+        return t, h, dewpoint(t, h)
+
+    def read_all_current(self, mac_addresses) -> Dict[str, Tuple[int, float, float, float]]:
+        """Returns the current battery level, temperature, humidity and dew point for the specified MAC addresses.
+
+        All Smart Gadgets are read in a single request, rather than sending one request
+        per value per Smart Gadget, and the Smart Gadgets are read in parallel, so the
+        request takes as long as the slowest Smart Gadget to respond.
+
+        Parameters
+        ----------
+        mac_addresses : :class:`list` of :class:`str`
+            A list of MAC addresses of the Smart Gadgets.
+
+        Returns
+        -------
+        :class:`dict`
+            The keys are the MAC addresses and each value is the battery level [%],
+            the temperature [degree C], the humidity [%RH] and the dew point [degree C].
+        """
+        mac_addresses = list(dict.fromkeys(mac_addresses))  # remove duplicates
+        if not mac_addresses:
+            return {}
+
+        def read(address):
+            return self._process('battery_temperature_humidity_dewpoint', address)
+
+        # one thread per Smart Gadget, each Smart Gadget has its own bluepy-helper process
+        with ThreadPoolExecutor(max_workers=len(mac_addresses)) as executor:
+            return dict(zip(mac_addresses, executor.map(read, mac_addresses)))
 
     def battery(self, mac_address) -> int:
         """Returns the battery level for the specified MAC address.
@@ -387,47 +705,149 @@ class SmartGadgetService(Service):
             formatted :class:`str`, a :class:`float` in seconds, or an
             :class:`int` in milliseconds.
         """
-        date = milliseconds_to_datetime(timestamp_to_milliseconds(date))
+        if isinstance(date, str):
+            date = _parse_iso(date)
+        # a naive datetime is already in local time, otherwise convert to local time
+        if not isinstance(date, datetime) or date.tzinfo is not None:
+            date = milliseconds_to_datetime(timestamp_to_milliseconds(date))
         logger.debug('Setting Raspberry Pi date to %r', date)
-        subprocess.run(['sudo', 'date', '-s', date.strftime('%a %d %b %Y %I:%M:%S %p')], check=True)
+        # the 'date' command accepts an ISO-8601 string (and does not depend on the locale)
+        subprocess.run(['sudo', 'date', '-s', date.isoformat(sep=' ')], check=True)
 
-    def _connect(self, mac_address):
-        """Connect to a Smart Gadget."""
+    @staticmethod
+    def _disconnect(gadget):
+        """Disconnect a Smart Gadget, ignoring the errors from a connection that already dropped."""
+        if getattr(gadget, '_helper', None) is None:  # bluepy has already disconnected
+            return
+        try:
+            gadget.disconnect()
+        except (BTLEException, OSError, AttributeError):
+            pass
+
+    def _is_gadget(self, device):
+        """Whether a :ref:`ScanEntry <scanentry>` is a Smart Gadget of this class."""
+        # compare the raw advertising data, getValueText() would decode the bytes
+        return device.scanData.get(device.COMPLETE_LOCAL_NAME) == self._device_name_bytes
+
+    def _connect(self, mac_address, retries_remaining):
+        """Connect to a Smart Gadget.
+
+        Returns the Smart Gadget and the number of retries that remain.
+        """
         gadget = self._gadgets_connected.get(mac_address)
         if gadget is None:
             device = self._gadgets_available.get(mac_address) or mac_address
             while gadget is None:
                 try:
-                    self._retries_remaining -= 1
+                    retries_remaining -= 1
                     if mac_address in self._requested_connections:
                         logger.info('Re-connecting to %r...', mac_address)
                     else:
                         logger.info('Connecting to %r...', mac_address)
-                    gadget = self._cls(device, interface=self._interface)
+                    gadget = self._cls(device, interface=self._interface, **self._kwargs)
                     self._gadgets_connected[mac_address] = gadget
                 except BTLEDisconnectError as e:
-                    if self._retries_remaining < 1:
+                    if retries_remaining < 1:
                         logger.error(e)
                         raise
-                    text = 'retry remains' if self._retries_remaining == 1 else 'retries remaining'
-                    logger.warning('%s -- %s %s', e, self._retries_remaining, text)
-        return gadget
+                    text = 'retry remains' if retries_remaining == 1 else 'retries remaining'
+                    logger.warning('%s -- %s %s', e, retries_remaining, text)
+                    self._wait(retries_remaining)
+        return gadget, retries_remaining
 
     def _process(self, method_name, mac_address, **kwargs):
         """All Smart Gadget services call this method to process the request."""
-        self._retries_remaining = self._max_attempts
+        if method_name not in self._SHARED_REQUESTS:
+            return self._execute(method_name, mac_address, kwargs)
+
+        key = (method_name, mac_address, tuple(sorted(kwargs.items())))
+        with self._in_progress_lock:
+            future = self._in_progress.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._in_progress[key] = Future()
+
+        if not is_owner:
+            logger.debug('Waiting for the result of %r from %r', method_name, mac_address)
+            return future.result()
+
+        try:
+            out = self._execute(method_name, mac_address, kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(out)
+            return out
+        finally:
+            with self._in_progress_lock:
+                del self._in_progress[key]
+
+    def _execute(self, method_name, mac_address, kwargs):
+        """Execute the request, re-connecting to the Smart Gadget if necessary."""
+        # the number of retries is a local variable so that requests can be processed concurrently
+        retries_remaining = self._max_attempts
         while True:
-            gadget = self._connect(mac_address)
+            gadget, retries_remaining = self._connect(mac_address, retries_remaining)
             try:
                 logger.info('Processing %r from %r -- kwargs=%s', method_name, mac_address, kwargs)
                 out = getattr(gadget, method_name)(**kwargs)
                 if mac_address not in self._requested_connections:
-                    self.disconnect_gadget(mac_address)
+                    self._release(mac_address)
                 return out
             except (BrokenPipeError, BTLEDisconnectError) as e:
-                if self._retries_remaining < 1:
+                if retries_remaining < 1:
                     logger.error(e)
                     raise
+                # the connection is broken, so it must not remain in the pool either
+                with self._pool_lock:
+                    self._pool.pop(mac_address, None)
                 self._gadgets_connected.pop(mac_address, None)
-                text = 'retry remains' if self._retries_remaining == 1 else 'retries remaining'
-                logger.warning('%s -- %s %s', e, self._retries_remaining, text)
+                text = 'retry remains' if retries_remaining == 1 else 'retries remaining'
+                logger.warning('%s -- %s %s', e, retries_remaining, text)
+                self._wait(retries_remaining)
+
+    def _recent_reading(self, mac_address):
+        """Returns the most recent (temperature, humidity) reading of a Smart Gadget
+        or :data:`None` if there is no reading that is recent enough."""
+        recent = self._recent.get(mac_address)
+        if recent is not None and time.monotonic() - recent[0] < self._RECENT_MAX_AGE:
+            return recent[1], recent[2]
+        return None
+
+    def _temperature_humidity(self, mac_address):
+        """Returns the temperature and humidity of a Smart Gadget.
+
+        A client that requests the temperature and humidity (or the dew point) and
+        then the temperature or the humidity gets the value from the same reading,
+        instead of requiring a second Bluetooth request (and possibly a second connection).
+        """
+        recent = self._recent_reading(mac_address)
+        if recent is not None:
+            return recent
+        t, h = self._process('temperature_humidity', mac_address)
+        self._recent[mac_address] = (time.monotonic(), t, h)
+        return t, h
+
+    def _wait(self, retries_remaining):
+        """Wait before the next attempt (exponential backoff with jitter)."""
+        n = self._max_attempts - retries_remaining - 1
+        delay = min(self._backoff_maximum, self._backoff_base * 2 ** n)
+        delay += random.uniform(0, self._backoff_jitter)
+        if delay > 0:
+            logger.debug('Waiting %.3f seconds before the next attempt', delay)
+            time.sleep(delay)
+
+    def _release(self, mac_address):
+        """Add a Smart Gadget to the pool of connections and disconnect the
+        least-recently used Smart Gadgets if the pool is full."""
+        with self._pool_lock:
+            if mac_address is not None:
+                self._pool[mac_address] = None
+                self._pool.move_to_end(mac_address)
+            evict = []
+            while len(self._pool) > self._pool_size:
+                evict.append(self._pool.popitem(last=False)[0])
+        for address in evict:
+            if address not in self._requested_connections:
+                self.disconnect_gadget(address)
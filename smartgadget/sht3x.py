@@ -2,19 +2,34 @@
 The SHT3X series Smart Gadget from Sensirion.
 """
 from time import perf_counter
+from itertools import islice
 from datetime import datetime
 from typing import Tuple
 
 try:
-    from bluepy.btle import Peripheral, UUID
+    from bluepy.btle import Peripheral, UUID, BTLEException
 except ImportError:  # then not on the Raspberry Pi
-    Peripheral, UUID = object, lambda u: u
+    Peripheral, UUID, BTLEException = object, lambda u: u, object
 
 from . import logger, timestamp_to_milliseconds, milliseconds_to_datetime
 from .smart_gadget import SmartGadget
 from .service import SmartGadgetService
 
 
+def _to_datetime(*arrays):
+    """Convert the timestamps in each N x 2 array to :class:`~datetime.datetime` objects.
+
+    The temperature and humidity values are logged at the same timestamps,
+    so each unique timestamp is only converted once.
+    """
+    converted = {}
+    for array in arrays:
+        for ms, _ in array:
+            if ms not in converted:
+                converted[ms] = milliseconds_to_datetime(ms)
+    return tuple([[converted[ms], v] for ms, v in array] for array in arrays)
+
+
 class SHT3X(SmartGadget):
 
     # This equals the value of DEVICE_NAME_CHARACTERISTIC_UUID
@@ -69,6 +84,48 @@ class SHT3X(SmartGadget):
     TEMPERATURE_HANDLE = 0x37  # READ
     TEMPERATURE_NOTIFICATION_HANDLE = 0x39  # READ + WRITE
 
+    # The ATT MTU to request before downloading the logged data. The default MTU of 23 bytes
+    # only fits 4 values in each notification. The Smart Gadget may accept a smaller value.
+    MTU = 247
+
+    # The values of these handles do not change while connected to the Smart Gadget
+    _IMMUTABLE_HANDLES = frozenset((
+        FIRMWARE_REVISION_STRING_HANDLE,
+        HARDWARE_REVISION_STRING_HANDLE,
+        SOFTWARE_REVISION_STRING_HANDLE,
+        MANUFACTURER_NAME_STRING_HANDLE,
+        MODEL_NUMBER_STRING_HANDLE,
+        SERIAL_NUMBER_STRING_HANDLE,
+        SYSTEM_ID_HANDLE,
+    ))
+
+    def __init__(self, device, interface=None, keep_notifications=False):
+        """The SHT3X series Smart Gadget from Sensirion.
+
+        Parameters
+        ----------
+        device
+            A MAC address as a :class:`str` or a :ref:`ScanEntry <scanentry>` object.
+        interface : :class:`int`, optional
+            The Bluetooth interface to use for the connection. For example, 0 or :data:`None`
+            means ``/dev/hci0``, 1 means ``/dev/hci1``.
+        keep_notifications : :class:`bool`, optional
+            Whether to enable the temperature and humidity notifications once, when
+            connected, and keep them enabled. Otherwise :meth:`.fetch_logged_data`
+            enables the notifications before and disables them after the download.
+            The notifications of a channel that is not downloaded are always disabled
+            for the download (and are re-enabled the next time that channel is downloaded).
+        """
+        # must exist before connecting since a failed connection calls disconnect()
+        self._immutable_cache = {}
+        self._notifications = set()
+        self._mtu_requested = False
+        super(SHT3X, self).__init__(device, interface=interface)
+        self._keep_notifications = keep_notifications
+        if keep_notifications:
+            self.enable_temperature_notifications()
+            self.enable_humidity_notifications()
+
     def temperature(self) -> float:
         """Returns the current temperature.
 
@@ -222,10 +279,12 @@ class SHT3X(SmartGadget):
     def enable_temperature_notifications(self):
         """Enable temperature notifications."""
         self._write(self.TEMPERATURE_NOTIFICATION_HANDLE, '<H', 1)
+        self._notifications.add(self.TEMPERATURE_NOTIFICATION_HANDLE)
 
     def disable_temperature_notifications(self):
         """Disable temperature notifications."""
         self._write(self.TEMPERATURE_NOTIFICATION_HANDLE, '<H', 0)
+        self._notifications.discard(self.TEMPERATURE_NOTIFICATION_HANDLE)
 
     def humidity_notifications_enabled(self) -> bool:
         """Returns whether humidity notifications are enabled.
@@ -240,10 +299,12 @@ class SHT3X(SmartGadget):
     def enable_humidity_notifications(self):
         """Enable humidity notifications."""
         self._write(self.HUMIDITY_NOTIFICATION_HANDLE, '<H', 1)
+        self._notifications.add(self.HUMIDITY_NOTIFICATION_HANDLE)
 
     def disable_humidity_notifications(self):
         """Disable humidity notifications."""
         self._write(self.HUMIDITY_NOTIFICATION_HANDLE, '<H', 0)
+        self._notifications.discard(self.HUMIDITY_NOTIFICATION_HANDLE)
 
     def set_sync_time(self, timestamp=None):
         """Sync the timestamps of the data logger.
@@ -302,11 +363,27 @@ class SHT3X(SmartGadget):
         if not enable_temperature and not enable_humidity:
             return [], []
 
-        # enable notifications
+        # request a larger MTU so that more values are sent in each notification
+        # (the MTU can only be exchanged once per connection)
+        if not self._mtu_requested:
+            self._mtu_requested = True
+            try:
+                self.setMTU(self.MTU)
+            except BTLEException as e:
+                logger.debug('Cannot set the MTU of %r to %d -- %s', self.addr, self.MTU, e)
+
+        # enable notifications for the requested channels (unless they are already enabled)
+        # and disable the notifications of a channel that was kept enabled but is not requested
         if enable_temperature:
-            self.enable_temperature_notifications()
+            if self.TEMPERATURE_NOTIFICATION_HANDLE not in self._notifications:
+                self.enable_temperature_notifications()
+        elif self.TEMPERATURE_NOTIFICATION_HANDLE in self._notifications:
+            self.disable_temperature_notifications()
         if enable_humidity:
-            self.enable_humidity_notifications()
+            if self.HUMIDITY_NOTIFICATION_HANDLE not in self._notifications:
+                self.enable_humidity_notifications()
+        elif self.HUMIDITY_NOTIFICATION_HANDLE in self._notifications:
+            self.disable_humidity_notifications()
 
         # set the logger timestamp information
         self.set_sync_time(sync)
@@ -328,23 +405,40 @@ class SHT3X(SmartGadget):
                 break
         self._write(self.START_LOGGER_DOWNLOAD_HANDLE, '<B', 0)
 
-        # disable notifications
-        if enable_temperature:
-            self.disable_temperature_notifications()
-        if enable_humidity:
-            self.disable_humidity_notifications()
+        # disable notifications (unless they should be kept enabled)
+        if not self._keep_notifications:
+            if enable_temperature:
+                self.disable_temperature_notifications()
+            if enable_humidity:
+                self.disable_humidity_notifications()
 
         if as_datetime:
-            temperatures = [[milliseconds_to_datetime(ms), v] for ms, v in self.delegate.temperatures]
-            humidities = [[milliseconds_to_datetime(ms), v] for ms, v in self.delegate.humidities]
-            return temperatures, humidities
+            return _to_datetime(self.delegate.temperatures, self.delegate.humidities)
 
         return self.delegate.temperatures, self.delegate.humidities
 
+    def disconnect(self):
+        """Disconnect from the Smart Gadget."""
+        self._immutable_cache.clear()
+        self._notifications.clear()
+        self._mtu_requested = False
+        super(SHT3X, self).disconnect()
+
+    def _read(self, hnd_or_uuid, fmt=None):
+        """Read data, the values of the immutable handles are only read once per connection."""
+        if hnd_or_uuid not in self._IMMUTABLE_HANDLES:
+            return super(SHT3X, self)._read(hnd_or_uuid, fmt=fmt)
+        try:
+            return self._immutable_cache[hnd_or_uuid]
+        except KeyError:
+            value = super(SHT3X, self)._read(hnd_or_uuid, fmt=fmt)
+            self._immutable_cache[hnd_or_uuid] = value
+            return value
+
 
 class SHT3XService(SmartGadgetService):
 
-    def __init__(self, interface=None):
+    def __init__(self, interface=None, keep_notifications=False):
         """The :class:`~msl.network.service.Service` for a :class:`.SHT3X` Smart Gadget.
 
         Parameters
@@ -352,8 +446,10 @@ class SHT3XService(SmartGadgetService):
         interface : :class:`int`, optional
             The Bluetooth interface to use for the connection. For example, 0 or :data:`None`
             means ``/dev/hci0``, 1 means ``/dev/hci1``.
+        keep_notifications : :class:`bool`, optional
+            Passed to :class:`.SHT3X` for every Smart Gadget that is connected to.
         """
-        super(SHT3XService, self).__init__(SHT3X, interface=interface)
+        super(SHT3XService, self).__init__(SHT3X, interface=interface, keep_notifications=keep_notifications)
 
     def oldest_timestamp(self, mac_address) -> int:
         """Returns the oldest timestamp of the data logger.
@@ -578,9 +674,9 @@ class SHT3XService(SmartGadgetService):
         :class:`list`
             The logged humidity values [%RH].
         """
-        def bad_timestamps(array):
-            # Get the timestamps that contain values that are `None`
-            return [ms for ms, v in array if v is None]
+        def num_missing(array):
+            # Get the number of values that are `None`
+            return sum(1 for _, v in array if v is None)
 
         def merge(logger_interval, original, latest):
             # Merge the data from `latest` into `original` that isn't `None`
@@ -592,124 +688,155 @@ class SHT3XService(SmartGadgetService):
             # the values instead.
             #
             # Find the index offset such that the values in the 2 lists are exactly the
-            # same (element wise).
-            index = max(0, round(abs(latest[0][0] - original[0][0]) / logger_interval) - 1)
+            # same (element wise). Values that are `None` in either list are ignored.
+            # islice() is used so that `original` is not copied for every trial index.
+            diff = abs(latest[0][0] - original[0][0])
+            index = max(0, (diff + logger_interval // 2) // logger_interval - 1)
             # check a range of indices centered around the best-guess index
-            indices = [index, index - 1, index + 1, index - 2, index + 2]
-            n1, n2 = len(original), len(latest)
-            for i in indices:
+            for i in (index, index - 1, index + 1, index - 2, index + 2):
                 if i < 0:
                     continue
-                index, j = i, 0
-                while i < n1 and j < n2:
-                    v1, v2 = original[i][1], latest[j][1]
-                    if v1 is not None and v2 is not None and v1 != v2:
-                        # then we have not found the index that aligns the 2 lists
-                        # as long as this index isn't the last item in the `indices`
-                        # list then we will try the next item in the `indices` list
-                        assert index != indices[-1], 'merging value mismatch -> {} != {}'.format(v1, v2)
-                        break
-                    i += 1
-                    j += 1
-                break  # all values that are not `None` are exactly the same (element-wise)
+                if all(v1 is None or v2 is None or v1 == v2
+                       for (_, v1), (_, v2) in zip(islice(original, i, None), latest)):
+                    index = i
+                    break
+            else:
+                # do not discard all the data that has been downloaded, the
+                # values in this range remain `None` in `original`
+                logger.warning('Cannot align the %d values that were re-downloaded from %r, '
+                               'the values are ignored', len(latest), mac_address)
+                return
 
             # we now have the index that aligns the lists, so merge them
-            i, j = index, 0
-            n1, n2 = len(original), len(latest)
-            while i < n1 and j < n2:
-                row = original[i]
-                value = latest[j][1]
-                if value is not None:
+            # (only the rows in `original` that are still missing a value need to be updated)
+            for row, (_, value) in zip(islice(original, index, None), latest):
+                if row[1] is None and value is not None:
                     row[1] = value
-                i += 1
-                j += 1
 
-        delegate = self._gadgets_connected[mac_address].delegate
-        interval = delegate.interval
+        # Only the data in the ranges that still contain `None` values are re-downloaded.
+        #
+        # There is a large overhead in setting up the Smart Gadget when 'fetch_logged_data'
+        # is called. For example, downloading about 12000 temperature and 12000 humidity
+        # data points takes about 80 seconds, so 24000/80 = 300 values/second. If, for example,
+        # one specified a timestamp range that fetched 9 temperature and 9 humidity values
+        # then that took about 1.5 seconds, so 18/1.5 = 12 values/second. Since the missing
+        # data packets are randomly scattered in small (4-, 8-, 12-byte) chunks throughout
+        # the data there is no point trying to re-download many small time ranges.
+        #
+        # Clusters of `None` values are merged into a single range unless they are separated
+        # by more than `max_gap` log events, which takes longer to download (about 1.5 seconds
+        # at 150 log events/second, for both temperature and humidity) than the overhead of
+        # downloading the clusters separately.
+        max_gap = 250
+
+        # the same `sync` value is passed to the Smart Gadget for every range that is
+        # downloaded, so only convert it to milliseconds once
+        if sync is not None:
+            sync = timestamp_to_milliseconds(sync)
+
+        interval = None
         temperatures, humidities = [], []
+        missing_t, missing_h = 0, 0
+        bad_t, bad_h = [], []
+        ranges = [(oldest, newest)]
         for iteration in range(num_iterations):
 
             if not enable_temperature and not enable_humidity:
                 break
 
-            t0 = perf_counter()
-            latest_t, latest_h = self._process(
-                'fetch_logged_data', mac_address,
-                enable_temperature=enable_temperature, enable_humidity=enable_humidity,
-                sync=sync, oldest=oldest, newest=newest, as_datetime=False
-            )
-            dt = perf_counter() - t0
-
+            dt = 0.
+            first_t, first_h = None, None
+            fetched_t, fetched_h, total_t, total_h = 0, 0, 0, 0
+            for oldest, newest in ranges:
+                t0 = perf_counter()
+                latest_t, latest_h = self._process(
+                    'fetch_logged_data', mac_address,
+                    enable_temperature=enable_temperature, enable_humidity=enable_humidity,
+                    sync=sync, oldest=oldest, newest=newest, as_datetime=False
+                )
+                dt += perf_counter() - t0
+
+                if first_t is None:
+                    first_t, first_h = latest_t, latest_h
+
+                if iteration == 0:
+                    temperatures, humidities = latest_t, latest_h
+                else:
+                    # there is nothing to merge if none of the values were re-downloaded
+                    n_t = len(latest_t) - num_missing(latest_t)
+                    n_h = len(latest_h) - num_missing(latest_h)
+                    if n_t:
+                        merge(interval, temperatures, latest_t)
+                    if n_h:
+                        merge(interval, humidities, latest_h)
+                    fetched_t += n_t
+                    fetched_h += n_h
+
+                total_t += len(latest_t)
+                total_h += len(latest_h)
+
+            # A single pass over each list finds the timestamps of the values that are
+            # still missing (a list is unchanged if its values were not downloaded)
+            if enable_temperature:
+                bad_t = [ms for ms, v in temperatures if v is None]
+                missing_t = len(bad_t)
+            if enable_humidity:
+                bad_h = [ms for ms, v in humidities if v is None]
+                missing_h = len(bad_h)
             if iteration == 0:
-                temperatures, humidities = latest_t, latest_h
-            else:
-                merge(interval, temperatures, latest_t)
-                merge(interval, humidities, latest_h)
+                fetched_t, fetched_h = total_t - missing_t, total_h - missing_h
+
+            if total_t:
+                logger.debug('Iteration %d of %d -- Fetched %d of %d temperature values in %.3f seconds. '
+                             '%d values are still missing',
+                             iteration+1, num_iterations, fetched_t, total_t, dt, missing_t)
+            if total_h:
+                logger.debug('Iteration %d of %d -- Fetched %d of %d humidity values in %.3f seconds. '
+                             '%d values are still missing',
+                             iteration+1, num_iterations, fetched_h, total_h, dt, missing_h)
 
             # has all the data been downloaded?
-            bad_timestamps_t = bad_timestamps(temperatures)
-            bad_timestamps_h = bad_timestamps(humidities)
-            if not bad_timestamps_t and not bad_timestamps_h:
+            if missing_t == 0 and missing_h == 0:
                 break
 
-            enable_temperature = len(bad_timestamps_t) > 0
-            enable_humidity = len(bad_timestamps_h) > 0
+            if interval is None:
+                # the timestamps of a download are exactly one logger interval apart
+                rows = temperatures if len(temperatures) > 1 else humidities
+                if len(rows) > 1:
+                    interval = rows[1][0] - rows[0][0]
+                else:
+                    interval = self._process('logger_interval', mac_address)
 
             # There is no point trying to re-download data from the Smart Gadget for the
             # values that are still `None` if the data is no longer available in the internal
-            # memory of the Smart Gadget
+            # memory of the Smart Gadget (or if the data was not downloaded in this iteration)
+            enable_temperature = bool(bad_t) and bool(first_t) and bad_t[-1] > first_t[0][0]
+            enable_humidity = bool(bad_h) and bool(first_h) and bad_h[-1] > first_h[0][0]
+
+            bad = set()
             if enable_temperature:
-                enable_temperature = bad_timestamps_t[-1] > latest_t[0][0]
+                bad.update(bad_t)
             if enable_humidity:
-                enable_humidity = bad_timestamps_h[-1] > latest_h[0][0]
+                bad.update(bad_h)
 
-            if latest_t:
-                n = len(latest_t) - len(bad_timestamps(latest_t))
-                logger.debug('Iteration %d of %d -- Fetched %d of %d temperature values in %.3f seconds. '
-                             '%d values are still missing',
-                             iteration+1, num_iterations, n, len(latest_t), dt, len(bad_timestamps_t))
-            if latest_h:
-                n = len(latest_h) - len(bad_timestamps(latest_h))
-                logger.debug('Iteration %d of %d -- Fetched %d of %d humidity values in %.3f seconds. '
-                             '%d values are still missing',
-                             iteration+1, num_iterations, n, len(latest_h), dt, len(bad_timestamps_h))
-
-            # Only fetch data in the range that still contains `None` values.
-            # Extend the range a little bit.
-            #
-            # One could modify the values of 'oldest' and 'newest' more cleverly to only
-            # re-download the data where the values are still 'None' in smaller ranges.
-            # However, there is a large overhead in setting up the Smart Gadget when
-            # 'fetch_logged_data' is called. For example, downloading about 12000 temperature
-            # and 12000 humidity data points takes about 80 seconds, so 24000/80 = 300 values/second.
-            # If, for example, one specified a timestamp range that fetched 9 temperature and 9
-            # humidity values then that took about 1.5 seconds, so 18/1.5 = 12 values/second.
-            # Since the missing data packets are randomly scattered in small (4-, 8-, 12-byte)
-            # chunks throughout the data there is really no point trying to re-download small
-            # time ranges.
-            #
-            # TODO Once the ranges where the data values need to be re-downloaded become isolated
-            #  clusters, like 20 missing values within the first 100 data points and 4 missing
-            #  values within the last 100 data points, we could start to break up fetching
-            #  the data into smaller ranges
-            oldest_t = bad_timestamps_t[0] if bad_timestamps_t else delegate.oldest
-            oldest_h = bad_timestamps_h[0] if bad_timestamps_h else delegate.oldest
-            oldest = min(oldest_t, oldest_h) - 2 * interval
-            newest_t = bad_timestamps_t[-1] if bad_timestamps_t else delegate.newest
-            newest_h = bad_timestamps_h[-1] if bad_timestamps_h else delegate.newest
-            newest = max(newest_t, newest_h) + 2 * interval
+            # Extend each range a little bit
+            ranges = []
+            for ms in sorted(bad):
+                if ranges and ms - ranges[-1][1] <= max_gap * interval:
+                    ranges[-1][1] = ms
+                else:
+                    ranges.append([ms, ms])
+            ranges = [(a - 2 * interval, b + 2 * interval) for a, b in ranges]
 
         if temperatures:
-            n = len(temperatures) - len(bad_timestamps(temperatures))
+            n = len(temperatures) - missing_t
             logger.debug('Finished -- Fetched %d of %d temperature values', n, len(temperatures))
 
         if humidities:
-            n = len(humidities) - len(bad_timestamps(humidities))
+            n = len(humidities) - missing_h
             logger.debug('Finished -- Fetched %d of %d humidity values', n, len(humidities))
 
         if as_datetime:
-            t = [[milliseconds_to_datetime(ms), v] for ms, v in temperatures]
-            h = [[milliseconds_to_datetime(ms), v] for ms, v in humidities]
-            return t, h
+            return _to_datetime(temperatures, humidities)
 
         return temperatures, humidities
@@ -11,6 +11,18 @@ except ImportError:  # then not on the Raspberry Pi
 
 from . import dewpoint, logger
 
+# Precompiled struct formats (the formats of the logger notifications are added when first received)
+_STRUCTS = {fmt: struct.Struct(fmt) for fmt in ('<f', '<Q', '<L', '<H', '<B')}
+
+
+def _struct(fmt):
+    """Returns the (cached) :class:`struct.Struct` for a format."""
+    try:
+        return _STRUCTS[fmt]
+    except KeyError:
+        s = _STRUCTS[fmt] = struct.Struct(fmt)
+        return s
+
 
 class SmartGadget(Peripheral):
 
@@ -132,6 +144,22 @@ class SmartGadget(Peripheral):
         t, h = self.temperature_humidity()
         return t, h, self.dewpoint(temperature=t, humidity=h)
 
+    def battery_temperature_humidity_dewpoint(self) -> Tuple[int, float, float, float]:
+        """Returns the current battery level, temperature, humidity and dew point.
+
+        Returns
+        -------
+        :class:`int`
+            The battery level [%].
+        :class:`float`
+            The temperature [degree C].
+        :class:`float`
+            The humidity [%RH].
+        :class:`float`
+            The dew point [degree C].
+        """
+        return (self.battery(),) + self.temperature_humidity_dewpoint()
+
     def rssi(self) -> Union[int, None]:
         """Returns the Received Signal Strength Indication (RSSI) for the last received broadcast from the device.
 
@@ -155,15 +183,10 @@ class SmartGadget(Peripheral):
         if isinstance(hnd_or_uuid, int):  # handle
             data = self.readCharacteristic(hnd_or_uuid)
         else:  # uuid
-            try:
-                c = self._characteristics[hnd_or_uuid]
-            except KeyError:
-                c = self.getCharacteristics(uuid=hnd_or_uuid)[0]
-                self._characteristics[hnd_or_uuid] = c
-            data = c.read()
+            data = self._characteristic(hnd_or_uuid).read()
         if fmt is None:
             return data.decode()
-        values = struct.unpack(fmt, data)
+        values = _struct(fmt).unpack(data)
         if len(values) == 1:
             logger.debug('READ  address=%r characteristic=0x%x -> %s', self.addr, hnd_or_uuid, values[0])
             return values[0]
@@ -178,16 +201,25 @@ class SmartGadget(Peripheral):
         value: The value to write
         """
         logger.debug('WRITE address=%r characteristic=0x%x value=%s', self.addr, hnd_or_uuid, value)
-        data = struct.pack(fmt, value)
+        data = _struct(fmt).pack(value)
         if isinstance(hnd_or_uuid, int):  # handle
             self.writeCharacteristic(hnd_or_uuid, data, withResponse=with_response)
         else:  # uuid
-            try:
-                c = self._characteristics[hnd_or_uuid]
-            except KeyError:
-                c = self.getCharacteristics(uuid=hnd_or_uuid)[0]
-                self._characteristics[hnd_or_uuid] = c
-            c.write(data, withResponse=with_response)
+            self._characteristic(hnd_or_uuid).write(data, withResponse=with_response)
+
+    def _characteristic(self, uuid):
+        """Returns the Characteristic object for a uuid.
+
+        The GATT discovery for a uuid is only performed the first time that the
+        uuid is requested, the Characteristic object (which knows its handle) is
+        cached for all subsequent read/write calls.
+        """
+        try:
+            return self._characteristics[uuid]
+        except KeyError:
+            c = self.getCharacteristics(uuid=uuid)[0]
+            self._characteristics[uuid] = c
+            return c
 
 
 class NotificationHandler(DefaultDelegate):
@@ -246,7 +278,7 @@ class NotificationHandler(DefaultDelegate):
         """
         n = (len(data) - 4)//4
         if n > 0:  # notification for logged data
-            values = struct.unpack('<I{}f'.format(n), data)
+            values = _struct('<I{}f'.format(n)).unpack(data)
             if handle == self.parent.TEMPERATURE_HANDLE:
                 array = self.temperatures
                 self.temperature_repeats = 0
@@ -256,6 +288,10 @@ class NotificationHandler(DefaultDelegate):
             else:
                 raise ValueError('Unhandled notification from handle={}'.format(handle))
 
+            if not array:
+                # the data for this handle was not requested (its notifications are still enabled)
+                return
+
             # data is downloaded from the newest to the oldest log event
             # the manual says that the run number starts at 0 but it actually starts at 1 (for firmware v1.3)
             run_number = values[0] - self.run_number_offset
@@ -268,6 +304,15 @@ class NotificationHandler(DefaultDelegate):
                 index -= 1
                 run_number += 1
 
+            # the data is downloaded from newest to oldest so the download has finished
+            # when the oldest value is received, there is no need to wait for the next
+            # single-value notification to arrive to decide that it has finished
+            if array and array[0][1] is not None:
+                if handle == self.parent.TEMPERATURE_HANDLE:
+                    self.temperatures_finished = True
+                else:
+                    self.humidities_finished = True
+
         else:
             # a notification for a single temperature or humidity value
             # it is possible that a single value is received intermittently within the logger notification